@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
-"""Patch F5-TTS to use soundfile instead of torchaudio.load (TorchCodec compatibility)"""
+"""Patch F5-TTS for this server.
+
+1. Use soundfile instead of torchaudio.load (TorchCodec compatibility)
+2. Let preprocess_ref_audio_text accept in-memory audio (bytes/BytesIO)
+
+Usage: patch_f5tts.py [path/to/utils_infer.py]
+"""
 
 import sys
 
-filepath = '/app/f5-tts/src/f5_tts/infer/utils_infer.py'
+filepath = (
+    sys.argv[1] if len(sys.argv) > 1
+    else '/app/f5-tts/src/f5_tts/infer/utils_infer.py'
+)
 
 with open(filepath, 'r') as f:
     content = f.read()
 
-old_code = 'audio, sr = torchaudio.load(ref_audio)'
-new_code = '''# Patched: use soundfile instead of torchaudio (TorchCodec compatibility)
+patches = [
+    (
+        'torchaudio.load -> soundfile',
+        'audio, sr = torchaudio.load(ref_audio)',
+        '''# Patched: use soundfile instead of torchaudio (TorchCodec compatibility)
     import soundfile as _sf
     _audio_np, sr = _sf.read(ref_audio)
     audio = torch.from_numpy(_audio_np).float()
@@ -17,12 +29,44 @@ new_code = '''# Patched: use soundfile instead of torchaudio (TorchCodec compati
         audio = audio.unsqueeze(0)
     else:
         audio = audio.T'''
+    ),
+    (
+        'in-memory reference audio',
+        'with open(ref_audio_orig, "rb") as audio_file:',
+        '''# Patched: accept in-memory audio (bytes or BytesIO) as well as paths.
+    # A BytesIO is hashed in place and rewound afterwards, not duplicated.
+    import io as _io
+    import contextlib as _contextlib
+
+    @_contextlib.contextmanager
+    def _rewound(buffer):
+        try:
+            yield buffer
+        finally:
+            buffer.seek(0)
+
+    if isinstance(ref_audio_orig, (bytes, bytearray)):
+        ref_audio_orig = _io.BytesIO(ref_audio_orig)
+    with (
+        _rewound(ref_audio_orig)
+        if isinstance(ref_audio_orig, _io.BytesIO)
+        else open(ref_audio_orig, "rb")
+    ) as audio_file:'''
+    ),
+]
 
-if old_code in content:
-    content = content.replace(old_code, new_code)
+patched = False
+for name, old_code, new_code in patches:
+    if old_code in content:
+        content = content.replace(old_code, new_code)
+        print(f'Patched utils_infer.py: {name}')
+        patched = True
+    else:
+        print(f'Warning: Could not find code to patch ({name}) - may already be patched')
+
+if patched:
     with open(filepath, 'w') as f:
         f.write(content)
     print('Successfully patched utils_infer.py')
-else:
-    print('Warning: Could not find code to patch - may already be patched')
-    sys.exit(0)
+
+sys.exit(0)
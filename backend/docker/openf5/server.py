@@ -12,17 +12,32 @@ MIT License
 """
 
 import os
+import sys
 import io
-import json
+import math
+import socket
 import base64
-import tempfile
+import fcntl
 import logging
+import tempfile
 import hashlib
+import time
+import queue
+import threading
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
 from pathlib import Path
+from urllib.parse import unquote
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, send_file
 from flask_cors import CORS
+from waitress import serve
+import orjson
 import torch
+import torch.multiprocessing as mp
+import torchaudio.functional as AF
 import numpy as np
 import soundfile as sf
 
@@ -36,17 +51,74 @@ logger = logging.getLogger('openf5-server')
 app = Flask(__name__)
 CORS(app)
 
+# F5-TTS source checkout (module level so spawned workers can unpickle it)
+sys.path.insert(0, '/app/f5-tts/src')
+
 # Global model instance
 f5_model = None
 device = None
+autocast_dtype = None
+
+# F5-TTS inference helpers, bound in load_models() once f5_tts is importable
+preprocess_ref_audio_text = None
+chunk_text = None
+convert_char_to_pinyin = None
+
+# Single GPU worker: model calls queue here in order while request threads
+# keep handling HTTP, JSON and file I/O concurrently
+GPU_EXEC = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gpu')
 
 # Voice storage (stores reference audio + transcript)
-VOICE_DIR = Path('/app/voices')
+VOICE_DIR = Path(os.environ.get('VOICE_DIR', '/app/voices'))
 VOICE_DIR.mkdir(exist_ok=True)
 
 # Sample rate for F5-TTS
 SAMPLE_RATE = 24000
 
+# Largest accepted inline (base64) reference audio, decoded size
+MAX_REF_AUDIO_BYTES = 50 * 1024 * 1024
+
+# Inference defaults (mirror f5_tts.infer.utils_infer)
+TARGET_RMS = 0.1
+CROSS_FADE_DURATION = 0.15
+NFE_STEP = 32
+CFG_STRENGTH = 2.0
+SWAY_SAMPLING_COEF = -1.0
+
+# Dynamic batching: chunks queued within BATCH_WAIT_MS of each other share
+# one sample() call; length buckets keep padding waste bounded
+MAX_BATCH = int(os.environ.get('MAX_BATCH', '8'))
+BATCH_WAIT_MS = float(os.environ.get('BATCH_WAIT_MS', '15'))
+BATCH_BUCKET_FRAMES = 256
+_batch_queue = queue.Queue()
+
+# Optional torch.compile of the DiT denoiser (TORCH_COMPILE=1 to enable)
+TORCH_COMPILE = os.environ.get('TORCH_COMPILE', '0') == '1'
+TORCH_COMPILE_MODE = os.environ.get('TORCH_COMPILE_MODE', 'default')
+
+# In-memory index of saved voices: name -> metadata (+ 'wav_path').
+# Built once at startup, then kept in sync by extract_voice/delete_voice.
+_voice_index = {}
+_voice_index_lock = threading.Lock()
+# name -> version of its metadata file as last scanned (see voice_file_version)
+_voice_versions = {}
+
+# Worker processes sharing one copy of the GPU weights (python server.py only)
+NUM_WORKERS = int(os.environ.get('NUM_WORKERS', '1'))
+# Request threads per worker (matches gunicorn --threads in the Dockerfile)
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', '8'))
+
+# Reference conditioning cache: key -> pre-computed mel + normalized transcript
+REF_CACHE_SIZE = int(os.environ.get('REF_CACHE_SIZE', '50'))
+_ref_cache = OrderedDict()
+_ref_cache_lock = threading.Lock()
+
+# Generated chunk audio: (reference key, speed, chunk text hash) -> waveform.
+# Repeated chunks (greetings, prompts) skip generation entirely.
+AUDIO_CACHE_SIZE = int(os.environ.get('AUDIO_CACHE_SIZE', '256'))
+_audio_cache = OrderedDict()
+_audio_cache_lock = threading.Lock()
+
 
 def get_device():
     """Detect and return the best available device."""
@@ -59,18 +131,48 @@ def get_device():
         return 'cpu'
 
 
+def preferred_half_dtype():
+    """Return bfloat16 where the GPU supports it, else float16."""
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+
+@contextmanager
+def inference_context():
+    """Disable autograd tracking and enable mixed precision on CUDA."""
+    with torch.inference_mode(), torch.autocast(
+        device_type='cuda',
+        dtype=autocast_dtype or torch.float16,
+        enabled=autocast_dtype is not None
+    ):
+        yield
+
+
+def json_response(obj, status=200):
+    """Serialize obj with orjson into a JSON response (faster than jsonify)."""
+    return app.response_class(
+        orjson.dumps(obj), status=status, mimetype='application/json'
+    )
+
+
+def run_on_gpu(fn, *args, **kwargs):
+    """Run fn on the dedicated GPU thread and wait for its result."""
+    return GPU_EXEC.submit(fn, *args, **kwargs).result()
+
+
 def load_models():
-    """Load F5-TTS model."""
+    """Load F5-TTS model and prepare this process to serve it."""
+    load_weights()
+    init_runtime()
+
+
+def load_weights():
+    """Load F5-TTS weights onto the device."""
     global f5_model, device
 
     device = get_device()
     logger.info(f"Loading F5-TTS model on device: {device}")
 
     try:
-        # Import F5-TTS
-        import sys
-        sys.path.insert(0, '/app/f5-tts/src')
-
         from f5_tts.api import F5TTS
 
         # Load model with OpenF5 Apache 2.0 licensed weights
@@ -82,6 +184,8 @@ def load_models():
             device=device
         )
 
+        f5_model.ema_model.eval()
+
         logger.info("F5-TTS model loaded successfully")
 
     except Exception as e:
@@ -89,13 +193,562 @@ def load_models():
         raise
 
 
+def init_runtime():
+    """
+    Prepare this process to serve the loaded model.
+
+    Binds inference helpers, picks the autocast dtype, starts the batcher,
+    indexes saved voices and warms up. Runs once per serving process.
+    """
+    global autocast_dtype
+    global preprocess_ref_audio_text, chunk_text, convert_char_to_pinyin
+
+    from f5_tts.infer.utils_infer import (
+        preprocess_ref_audio_text,
+        chunk_text
+    )
+    from f5_tts.model.utils import convert_char_to_pinyin
+
+    # F5-TTS loads half-precision weights on capable GPUs; autocast to
+    # the same dtype so matmuls are not re-cast while any fp32 paths
+    # still get reduced precision
+    if device != 'cpu':
+        model_dtype = next(f5_model.ema_model.parameters()).dtype
+        if model_dtype in (torch.float16, torch.bfloat16):
+            autocast_dtype = model_dtype
+        else:
+            autocast_dtype = preferred_half_dtype()
+        logger.info(f"Autocast dtype: {autocast_dtype}")
+
+    threading.Thread(target=batch_loop, name='batcher', daemon=True).start()
+
+    load_voice_index()
+    warm_voice_refs()
+
+    if TORCH_COMPILE:
+        compile_models()
+
+    # Pay cuDNN autotuning, lazy kernel loading and any compilation
+    # before the first request
+    logger.info("Warming up F5-TTS")
+    warmup_models()
+
+
+def compile_models():
+    """
+    Wrap the DiT denoiser in torch.compile (compiled on first warm-up).
+
+    The transformer runs once per flow-matching step, so it is the part
+    worth compiling. Sequence length follows the text, so shapes are
+    compiled as dynamic rather than recompiling per request length.
+    """
+    logger.info(f"Compiling F5-TTS transformer (mode={TORCH_COMPILE_MODE})")
+    f5_model.ema_model.transformer = torch.compile(
+        f5_model.ema_model.transformer,
+        mode=TORCH_COMPILE_MODE,
+        fullgraph=False,
+        dynamic=True
+    )
+
+
+def warmup_models():
+    """Run one short synthesis on a synthetic reference."""
+    audio = torch.randn(1, 3 * SAMPLE_RATE) * TARGET_RMS
+    ref = {
+        'mel': run_on_gpu(extract_mel, audio),
+        'ref_text': 'This is a short warm up reference. ',
+        'rms': TARGET_RMS,
+        'duration': 3.0
+    }
+    generate_speech(ref, 'Warming up the model.')
+
+
+@contextmanager
+def voice_dir_lock():
+    """Serialize saved-voice writes and deletes across threads and workers."""
+    with open(VOICE_DIR / '.lock', 'wb') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def write_voice_file(path, data):
+    """
+    Write a saved-voice file through a unique temp file and os.replace().
+
+    Readers never see a partial file, and every write creates a new inode,
+    which voice_file_version() relies on.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=VOICE_DIR, prefix=f'.{path.name}.', suffix='.tmp'
+    )
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def voice_file_version(path):
+    """
+    Identify one write of a voice metadata file.
+
+    Files are only ever replaced, never rewritten, so (mtime, inode)
+    changes on every write even where timestamps are coarse.
+    """
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_ino)
+
+
+def index_voice(name, data, version=None):
+    """Add or replace a saved voice in the in-memory index."""
+    # Older voice files embed the audio as base64; the WAV is used instead
+    entry = {k: v for k, v in data.items() if k != 'audio_b64'}
+    wav_path = VOICE_DIR / f"{name}.wav"
+    entry['wav_path'] = str(wav_path) if wav_path.exists() else None
+    # Metadata is written last, so its version identifies the whole voice
+    if version is None:
+        version = voice_file_version(VOICE_DIR / f"{name}.json")
+    entry['version'] = version
+
+    with _voice_index_lock:
+        _voice_index[name] = entry
+        _voice_versions[name] = version
+
+
+def load_voice_index():
+    """Scan VOICE_DIR and (re)build the saved voice index."""
+    with _voice_index_lock:
+        old_versions = {name: v['version'] for name, v in _voice_index.items()}
+
+    versions = {}
+    names = set()
+    for voice_file in VOICE_DIR.glob('*.json'):
+        try:
+            # Version first: a write racing the read is caught next refresh
+            version = voice_file_version(voice_file)
+            versions[voice_file.stem] = version
+            with open(voice_file, 'rb') as f:
+                index_voice(voice_file.stem, orjson.loads(f.read()), version)
+            names.add(voice_file.stem)
+        except Exception as e:
+            logger.warning(f"Could not read voice file {voice_file}: {e}")
+
+    # Drop cached conditioning for voices deleted or overwritten elsewhere
+    with _voice_index_lock:
+        _voice_versions.clear()
+        _voice_versions.update(versions)
+        removed = [name for name in _voice_index if name not in names]
+        for name in removed:
+            del _voice_index[name]
+        changed = [
+            name for name, version in old_versions.items()
+            if name in _voice_index and _voice_index[name]['version'] != version
+        ]
+    for name in removed + changed:
+        evict_voice_refs(name)
+
+    logger.info(f"Indexed {len(names)} saved voices")
+
+
+def scan_voice_versions():
+    """Return name -> version for every voice metadata file on disk."""
+    versions = {}
+    for voice_file in VOICE_DIR.glob('*.json'):
+        try:
+            versions[voice_file.stem] = voice_file_version(voice_file)
+        except FileNotFoundError:
+            continue
+    return versions
+
+
+def refresh_voice_index():
+    """
+    Rescan VOICE_DIR if a sibling worker process changed it.
+
+    Compares per-voice metadata versions rather than the directory mtime,
+    which can miss two changes within one coarse timestamp tick. Each
+    worker keeps its own index; with a single process the index is always
+    current and this is a no-op.
+    """
+    if NUM_WORKERS == 1:
+        return
+
+    versions = scan_voice_versions()
+    with _voice_index_lock:
+        stale = versions != _voice_versions
+    if stale:
+        load_voice_index()
+
+
+def warm_voice_refs():
+    """Pre-compute reference mels for saved voices, up to the cache size."""
+    with _voice_index_lock:
+        voices = list(_voice_index.items())[:REF_CACHE_SIZE]
+
+    for name, voice in voices:
+        if voice['wav_path'] is None:
+            continue
+        try:
+            saved_reference(name, voice)
+        except Exception as e:
+            logger.warning(f"Could not prepare voice '{name}': {e}")
+
+
+def ref_cache_key(ref_text, voice_name=None, version=None, ref_audio_bytes=None):
+    """
+    Build a reference cache key.
+
+    Saved voices are keyed by name and version (see voice_file_version), so an
+    overwritten voice never hits entries built from its old files; inline
+    audio by a hash of all of its bytes, so distinct uploads never share
+    conditioning.
+    """
+    if voice_name is not None:
+        return ('name', voice_name, version, ref_text)
+
+    digest = hashlib.blake2b(ref_audio_bytes, digest_size=16).hexdigest()
+    return ('audio', digest, ref_text)
+
+
+def evict_voice_refs(voice_name):
+    """
+    Drop cached references and audio for a saved voice (after overwrite/delete).
+
+    Keys carry the voice version, so this only frees memory early; stale
+    entries written back by in-flight requests are never hit.
+    """
+    with _ref_cache_lock:
+        for key in [k for k in _ref_cache if k[:2] == ('name', voice_name)]:
+            del _ref_cache[key]
+    with _audio_cache_lock:
+        for key in [k for k in _audio_cache if k[0][:2] == ('name', voice_name)]:
+            del _audio_cache[key]
+
+
+def extract_mel(audio):
+    """Compute the (1, frames, n_mels) mel-spectrogram of a mono waveform."""
+    with torch.inference_mode():
+        return f5_model.ema_model.mel_spec(audio.to(device)).permute(0, 2, 1)
+
+
+def prepare_reference(ref_audio, ref_text):
+    """
+    Preprocess reference audio and compute its mel-spectrogram once.
+
+    ref_audio may be a path or a BytesIO (see patch_f5tts.py).
+
+    Returns a dict with the mel (on device), normalized transcript, original
+    RMS and duration, ready to condition ema_model.sample().
+    """
+    ref_file, ref_text = preprocess_ref_audio_text(
+        ref_audio, ref_text, show_info=logger.debug
+    )
+
+    audio, sr = sf.read(ref_file, dtype='float32', always_2d=True)
+    audio = torch.from_numpy(audio.mean(axis=1)).unsqueeze(0)
+
+    rms = torch.sqrt(torch.mean(torch.square(audio))).item()
+    if rms < TARGET_RMS:
+        audio = audio * TARGET_RMS / rms
+    if sr != SAMPLE_RATE:
+        audio = AF.resample(audio, sr, SAMPLE_RATE)
+
+    mel = run_on_gpu(extract_mel, audio)
+
+    return {
+        'mel': mel,
+        'ref_text': ref_text,
+        'rms': rms,
+        'duration': audio.shape[-1] / SAMPLE_RATE
+    }
+
+
+def get_reference(key, build_ref):
+    """
+    Return cached reference conditioning for key, building it on a miss.
+
+    build_ref is called without arguments only on a cache miss and must
+    return the dict produced by prepare_reference().
+    """
+    with _ref_cache_lock:
+        ref = _ref_cache.get(key)
+        if ref is not None:
+            _ref_cache.move_to_end(key)
+            return ref
+
+    ref = build_ref()
+    # Lets generate_speech() key its sentence audio cache by reference
+    ref['key'] = key
+
+    with _ref_cache_lock:
+        _ref_cache[key] = ref
+        _ref_cache.move_to_end(key)
+        while len(_ref_cache) > REF_CACHE_SIZE:
+            _ref_cache.popitem(last=False)
+
+    return ref
+
+
+def chunk_duration(ref, gen_text, speed):
+    """Return total mel frames (reference + generated) for one chunk."""
+    ref_len = ref['mel'].shape[1]
+
+    # Very short chunks sound rushed at normal speed (same as upstream)
+    gen_len = len(gen_text.encode('utf-8'))
+    local_speed = 0.3 if gen_len < 10 else speed
+    ref_text_len = len(ref['ref_text'].encode('utf-8'))
+
+    return ref_len + int(ref_len / ref_text_len * gen_len / local_speed)
+
+
+def sample_batch(items):
+    """
+    Generate several chunks in one ema_model.sample() call.
+
+    References are right-padded into one conditioning tensor; lens and
+    per-item durations let the model mask the padding. Each result is
+    vocoded separately since output lengths differ.
+    """
+    ref_lens = [item['ref']['mel'].shape[1] for item in items]
+    durations = [item['duration'] for item in items]
+
+    cond = torch.nn.utils.rnn.pad_sequence(
+        [item['ref']['mel'][0] for item in items], batch_first=True
+    )
+    text_list = convert_char_to_pinyin(
+        [item['ref']['ref_text'] + item['text'] for item in items]
+    )
+
+    with inference_context():
+        generated, _ = f5_model.ema_model.sample(
+            cond=cond,
+            text=text_list,
+            duration=torch.tensor(durations, device=cond.device),
+            lens=torch.tensor(ref_lens, device=cond.device),
+            steps=NFE_STEP,
+            cfg_strength=CFG_STRENGTH,
+            sway_sampling_coef=SWAY_SAMPLING_COEF
+        )
+
+    # Vocoder stays in fp32 (its inverse STFT has no half-precision kernels)
+    waves = []
+    with torch.inference_mode():
+        generated = generated.to(torch.float32)
+        for i, item in enumerate(items):
+            mel = generated[i:i + 1, ref_lens[i]:durations[i], :].permute(0, 2, 1)
+
+            if f5_model.mel_spec_type == 'vocos':
+                wave = f5_model.vocoder.decode(mel)
+            else:
+                wave = f5_model.vocoder(mel)
+
+            rms = item['ref']['rms']
+            if rms < TARGET_RMS:
+                wave = wave * rms / TARGET_RMS
+
+            waves.append(wave.squeeze().cpu().numpy())
+
+    return waves
+
+
+def submit_chunk(ref, gen_text, speed):
+    """Queue one chunk for batched generation and return its Future."""
+    item = {
+        'ref': ref,
+        'text': gen_text,
+        'duration': chunk_duration(ref, gen_text, speed),
+        'future': Future()
+    }
+    _batch_queue.put(item)
+    return item['future']
+
+
+def batch_loop():
+    """
+    Coalesce queued chunks into batches and run them on the GPU thread.
+
+    Waits up to BATCH_WAIT_MS after the first chunk for up to MAX_BATCH
+    chunks, then groups them by length bucket so similar durations share
+    a forward pass.
+    """
+    while True:
+        items = [_batch_queue.get()]
+        deadline = time.monotonic() + BATCH_WAIT_MS / 1000
+        while len(items) < MAX_BATCH:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(_batch_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        buckets = {}
+        for item in items:
+            bucket = item['duration'] // BATCH_BUCKET_FRAMES
+            buckets.setdefault(bucket, []).append(item)
+
+        for group in buckets.values():
+            try:
+                waves = run_on_gpu(sample_batch, group)
+            except Exception as e:
+                for item in group:
+                    item['future'].set_exception(e)
+                continue
+            for item, wave in zip(group, waves):
+                item['future'].set_result(wave)
+
+
+def encode_wav(audio, sample_rate):
+    """Encode a mono float waveform as 16-bit PCM WAV bytes."""
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def cross_fade(waves):
+    """Concatenate chunk waveforms with a short linear cross-fade."""
+    fade_len = int(CROSS_FADE_DURATION * SAMPLE_RATE)
+    final = waves[0]
+
+    for wave in waves[1:]:
+        n = min(fade_len, len(final), len(wave))
+        if n <= 0:
+            final = np.concatenate([final, wave])
+            continue
+        ramp = np.linspace(1.0, 0.0, n, dtype=np.float32)
+        overlap = final[-n:] * ramp + wave[:n] * (1.0 - ramp)
+        final = np.concatenate([final[:-n], overlap, wave[n:]])
+
+    return final
+
+
+def audio_cache_key(ref, chunk, speed):
+    """Key generated audio by reference, speed and a hash of the chunk text."""
+    digest = hashlib.blake2b(chunk.encode('utf-8'), digest_size=16).digest()
+    return (ref['key'], float(speed), digest)
+
+
+def get_cached_audio(key):
+    """Return cached chunk audio for key, or None."""
+    with _audio_cache_lock:
+        wave = _audio_cache.get(key)
+        if wave is not None:
+            _audio_cache.move_to_end(key)
+        return wave
+
+
+def put_cached_audio(key, wave):
+    """Store chunk audio, evicting the least recently used entries."""
+    with _audio_cache_lock:
+        _audio_cache[key] = wave
+        _audio_cache.move_to_end(key)
+        while len(_audio_cache) > AUDIO_CACHE_SIZE:
+            _audio_cache.popitem(last=False)
+
+
+def generate_speech(ref, text, speed=1.0):
+    """
+    Synthesize text with a cached reference, chunking long input.
+
+    Equivalent to F5TTS.infer() but skips reference loading, resampling
+    and mel extraction, which are done once in prepare_reference().
+    Chunks already generated for this reference and speed come from the
+    audio cache; the rest go through the batcher and may share a forward
+    pass with other requests. Blank text returns an empty waveform
+    without touching the GPU.
+    """
+    if not text.strip():
+        return np.zeros(0, dtype=np.float32), SAMPLE_RATE
+
+    ref_seconds = ref['duration']
+    max_chars = int(
+        len(ref['ref_text'].encode('utf-8')) / ref_seconds
+        * (22 - ref_seconds) * speed
+    )
+    # Upstream packs sentences up to max_chars, so short sentences share a
+    # chunk (and its pacing) with their neighbours
+    chunks = chunk_text(text, max_chars=max_chars)
+
+    # References built outside get_reference() (warm-up) are not cached
+    cacheable = 'key' in ref
+
+    waves = [None] * len(chunks)
+    pending = []
+    for i, chunk in enumerate(chunks):
+        key = audio_cache_key(ref, chunk, speed) if cacheable else None
+        wave = get_cached_audio(key) if cacheable else None
+        if wave is not None:
+            waves[i] = wave
+        else:
+            pending.append((i, key, submit_chunk(ref, chunk, speed)))
+
+    for i, key, future in pending:
+        waves[i] = future.result()
+        if cacheable:
+            put_cached_audio(key, waves[i])
+
+    return cross_fade(waves), SAMPLE_RATE
+
+
+def read_json_body():
+    """Parse the request body with orjson; None if missing or not an object."""
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def saved_reference(name, voice):
+    """Return cached conditioning for a saved voice from the index."""
+    key = ref_cache_key(
+        voice['transcript'], voice_name=name, version=voice['version']
+    )
+    # On a miss, read the WAV in one call (page-cache backed after the
+    # first read) and preprocess it in memory rather than by path
+    return get_reference(
+        key,
+        lambda: prepare_reference(
+            io.BytesIO(Path(voice['wav_path']).read_bytes()),
+            voice['transcript']
+        )
+    )
+
+
+def inline_reference(audio_bytes, ref_text):
+    """Return cached conditioning for uploaded reference audio bytes."""
+    key = ref_cache_key(ref_text, ref_audio_bytes=audio_bytes)
+    # Decoded bytes go to preprocessing in memory (no temp file)
+    return get_reference(
+        key, lambda: prepare_reference(io.BytesIO(audio_bytes), ref_text)
+    )
+
+
+def speech_response(ref, text, speed):
+    """Generate speech and return it as a WAV attachment."""
+    logger.info(f"Synthesizing: '{text[:50]}...' with voice reference")
+
+    audio_output, sr = generate_speech(ref, text, speed=speed)
+
+    return send_file(
+        io.BytesIO(encode_wav(audio_output, sr)),
+        mimetype='audio/wav',
+        as_attachment=True,
+        download_name='output.wav'
+    )
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
     cuda_available = torch.cuda.is_available()
     gpu_name = torch.cuda.get_device_name(0) if cuda_available else None
 
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'model': 'openf5_tts',
         'license': 'Apache 2.0',
@@ -108,7 +761,7 @@ def health():
 @app.route('/info', methods=['GET'])
 def info():
     """Return model information."""
-    return jsonify({
+    return json_response({
         'model': 'OpenF5-TTS',
         'license': 'Apache 2.0',
         'weights': 'OpenF5 (Emilia-YODAS trained)',
@@ -131,77 +784,91 @@ def extract_voice():
     - audio: WAV file (3-30 seconds recommended)
     - transcript: Text transcript of the audio
     - name: (optional) Name to save the voice as
+
+    Query parameters:
+    - inline=1: (optional) Include the processed WAV as base64 'audio'
     """
     try:
         if 'audio' not in request.files:
-            return jsonify({'error': 'No audio file provided'}), 400
+            return json_response({'error': 'No audio file provided'}, 400)
 
         audio_file = request.files['audio']
         transcript = request.form.get('transcript', '')
         voice_name = request.form.get('name')
 
         if not transcript:
-            return jsonify({'error': 'Transcript is required'}), 400
+            return json_response({'error': 'Transcript is required'}, 400)
+
+        # Read audio data as float32 (frames x channels)
+        audio_data, sample_rate = sf.read(
+            audio_file, dtype='float32', always_2d=True
+        )
 
-        # Read audio data
-        audio_data, sample_rate = sf.read(audio_file)
+        # Convert to mono (before resampling: one channel to process)
+        if audio_data.shape[1] > 1:
+            audio_data = audio_data.mean(axis=1, dtype=np.float32)
+        else:
+            audio_data = audio_data[:, 0]
 
-        # Resample if needed
+        # Resample if needed (torchaudio's sinc kernel, much faster than librosa)
         if sample_rate != SAMPLE_RATE:
-            import librosa
-            audio_data = librosa.resample(
-                audio_data,
-                orig_sr=sample_rate,
-                target_sr=SAMPLE_RATE
-            )
+            audio_t = torch.from_numpy(np.ascontiguousarray(audio_data))
+            audio_data = AF.resample(
+                audio_t,
+                orig_freq=sample_rate,
+                new_freq=SAMPLE_RATE,
+                resampling_method='sinc_interp_kaiser'
+            ).numpy()
             sample_rate = SAMPLE_RATE
 
-        # Convert to mono if stereo
-        if len(audio_data.shape) > 1:
-            audio_data = np.mean(audio_data, axis=1)
+        # Encode WAV once; reused for disk and inline response
+        wav_bytes = encode_wav(audio_data, SAMPLE_RATE)
 
-        # Encode audio as base64
-        buffer = io.BytesIO()
-        sf.write(buffer, audio_data, SAMPLE_RATE, format='WAV')
-        audio_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-        # Create voice ID from content hash
-        voice_id = hashlib.md5(
-            (audio_b64 + transcript).encode()
-        ).hexdigest()[:16]
+        # Create voice ID from a hash of the raw samples (buffer protocol,
+        # no copy) so it does not depend on the WAV container encoding
+        h = hashlib.blake2b(digest_size=8)
+        h.update(np.ascontiguousarray(audio_data))
+        h.update(transcript.encode('utf-8'))
+        voice_id = h.hexdigest()
 
         duration = len(audio_data) / SAMPLE_RATE
 
         # Save if name provided
         if voice_name:
-            voice_path = VOICE_DIR / f"{voice_name}.json"
             voice_data = {
-                'audio_b64': audio_b64,
                 'transcript': transcript,
                 'sample_rate': SAMPLE_RATE,
                 'duration': duration,
                 'model': 'openf5_tts'
             }
-            with open(voice_path, 'w') as f:
-                json.dump(voice_data, f)
 
-            # Also save raw audio for direct use
-            audio_path = VOICE_DIR / f"{voice_name}.wav"
-            sf.write(str(audio_path), audio_data, SAMPLE_RATE)
+            # Reference audio lives only in the WAV next to the metadata;
+            # the metadata goes last so a complete voice is never half-new
+            with voice_dir_lock():
+                write_voice_file(VOICE_DIR / f"{voice_name}.wav", wav_bytes)
+                write_voice_file(
+                    VOICE_DIR / f"{voice_name}.json", orjson.dumps(voice_data)
+                )
+                index_voice(voice_name, voice_data)
+            evict_voice_refs(voice_name)
 
             logger.info(f"Voice saved as: {voice_name}")
 
         # Return VoiceInfo format expected by CLI
-        return jsonify({
+        result = {
             'name': voice_name if voice_name else voice_id,
             'transcript': transcript,
             'model': 'openf5_tts',
             'duration': duration
-        })
+        }
+        if request.args.get('inline') == '1':
+            result['audio'] = base64.b64encode(wav_bytes).decode('ascii')
+
+        return json_response(result)
 
     except Exception as e:
         logger.error(f"Voice extraction failed: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @app.route('/synthesize', methods=['POST'])
@@ -217,123 +884,118 @@ def synthesize():
     - speed: (optional) Speech speed (default: 1.0)
     """
     try:
-        data = request.get_json()
+        data = read_json_body()
 
         if not data:
-            return jsonify({'error': 'JSON body required'}), 400
+            return json_response({'error': 'JSON body required'}, 400)
 
         text = data.get('text')
         if not text:
-            return jsonify({'error': 'Text is required'}), 400
+            return json_response({'error': 'Text is required'}, 400)
 
         speed = data.get('speed', 1.0)
 
-        # Get reference audio and transcript
-        ref_audio_path = None
-        ref_text = None
-        temp_ref_file = None
+        # Resolve reference conditioning (cached per voice/audio + transcript)
+        if 'name' in data:
+            # Load saved voice
+            voice_name = data['name']
+
+            refresh_voice_index()
+            with _voice_index_lock:
+                voice = _voice_index.get(voice_name)
+
+            if voice is None or voice['wav_path'] is None:
+                return json_response({'error': f"Voice '{voice_name}' not found"}, 404)
+
+            ref = saved_reference(voice_name, voice)
+
+        elif 'audio' in data:
+            # Use provided audio
+            ref_text = data.get('transcript', '')
+
+            if not ref_text:
+                return json_response({'error': 'Transcript required with audio'}, 400)
+
+            audio_b64 = data['audio']
+            if len(audio_b64) * 3 // 4 > MAX_REF_AUDIO_BYTES:
+                return json_response({'error': 'Reference audio too large'}, 413)
+
+            audio_bytes = base64.b64decode(audio_b64, validate=False)
+            ref = inline_reference(audio_bytes, ref_text)
+
+        else:
+            return json_response({'error': 'Either name or audio is required'}, 400)
+
+        return speech_response(ref, text, speed)
+
+    except Exception as e:
+        logger.error(f"Synthesis failed: {e}")
+        traceback.print_exc()
+        return json_response({'error': str(e)}, 500)
+
+
+@app.route('/synthesize_raw', methods=['POST'])
+def synthesize_raw():
+    """
+    Synthesize speech from a raw WAV reference (no JSON or base64).
+
+    Expects the reference WAV as the request body and URL-encoded UTF-8
+    headers:
+    - X-Text: Text to synthesize
+    - X-Transcript: Transcript of the reference audio
+    - X-Speed: (optional) Speech speed (default: 1.0)
+    """
+    try:
+        text = unquote(request.headers.get('X-Text', ''))
+        if not text:
+            return json_response({'error': 'Text is required'}, 400)
+
+        ref_text = unquote(request.headers.get('X-Transcript', ''))
+        if not ref_text:
+            return json_response({'error': 'Transcript required with audio'}, 400)
 
         try:
-            if 'name' in data:
-                # Load saved voice
-                voice_name = data['name']
-
-                # Check for WAV file first
-                wav_path = VOICE_DIR / f"{voice_name}.wav"
-                json_path = VOICE_DIR / f"{voice_name}.json"
-
-                if wav_path.exists():
-                    ref_audio_path = str(wav_path)
-                    with open(json_path) as f:
-                        voice_data = json.load(f)
-                    ref_text = voice_data['transcript']
-                else:
-                    return jsonify({'error': f"Voice '{voice_name}' not found"}), 404
-
-            elif 'audio' in data:
-                # Use provided audio
-                audio_b64 = data['audio']
-                ref_text = data.get('transcript', '')
-
-                if not ref_text:
-                    return jsonify({'error': 'Transcript required with audio'}), 400
-
-                # Decode and save to temp file
-                audio_bytes = base64.b64decode(audio_b64)
-                temp_ref_file = tempfile.NamedTemporaryFile(
-                    suffix='.wav', delete=False
-                )
-                temp_ref_file.write(audio_bytes)
-                temp_ref_file.close()
-                ref_audio_path = temp_ref_file.name
+            speed = float(request.headers.get('X-Speed', 1.0))
+        except ValueError:
+            speed = None
+        if speed is None or not (math.isfinite(speed) and speed > 0):
+            return json_response({'error': 'X-Speed must be a positive number'}, 400)
 
-            else:
-                return jsonify({'error': 'Either name or audio is required'}), 400
-
-            # Generate with F5-TTS
-            logger.info(f"Synthesizing: '{text[:50]}...' with voice reference")
-
-            # Create temp output file
-            with tempfile.NamedTemporaryFile(
-                suffix='.wav', delete=False
-            ) as tmp_out:
-                output_path = tmp_out.name
-
-            # Run synthesis
-            audio_output, sr, _ = f5_model.infer(
-                ref_file=ref_audio_path,
-                ref_text=ref_text,
-                gen_text=text,
-                speed=speed
-            )
-
-            # Save output
-            sf.write(output_path, audio_output, sr)
-
-            # Read and return
-            with open(output_path, 'rb') as f:
-                audio_bytes = f.read()
-
-            os.unlink(output_path)
-
-            buffer = io.BytesIO(audio_bytes)
-            return send_file(
-                buffer,
-                mimetype='audio/wav',
-                as_attachment=True,
-                download_name='output.wav'
-            )
-
-        finally:
-            # Clean up temp reference file
-            if temp_ref_file and os.path.exists(temp_ref_file.name):
-                os.unlink(temp_ref_file.name)
+        if (request.content_length or 0) > MAX_REF_AUDIO_BYTES:
+            return json_response({'error': 'Reference audio too large'}, 413)
+
+        audio_bytes = request.stream.read(MAX_REF_AUDIO_BYTES + 1)
+        if not audio_bytes:
+            return json_response({'error': 'Reference audio body required'}, 400)
+        if len(audio_bytes) > MAX_REF_AUDIO_BYTES:
+            return json_response({'error': 'Reference audio too large'}, 413)
+
+        ref = inline_reference(audio_bytes, ref_text)
+
+        return speech_response(ref, text, speed)
 
     except Exception as e:
         logger.error(f"Synthesis failed: {e}")
-        import traceback
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @app.route('/voices', methods=['GET'])
 def list_voices():
     """List all saved voices."""
-    voices = []
-    for voice_file in VOICE_DIR.glob('*.json'):
-        try:
-            with open(voice_file) as f:
-                data = json.load(f)
-            voices.append({
-                'name': voice_file.stem,
+    refresh_voice_index()
+    with _voice_index_lock:
+        voices = [
+            {
+                'name': name,
                 'transcript': data.get('transcript', ''),
                 'duration': data.get('duration', 0),
                 'model': data.get('model', 'unknown')
-            })
-        except Exception as e:
-            logger.warning(f"Could not read voice file {voice_file}: {e}")
+            }
+            for name, data in _voice_index.items()
+        ]
 
-    return jsonify({'voices': voices})
+    return json_response({'voices': voices})
 
 
 @app.route('/voices/<name>', methods=['DELETE'])
@@ -342,17 +1004,22 @@ def delete_voice(name):
     json_path = VOICE_DIR / f"{name}.json"
     wav_path = VOICE_DIR / f"{name}.wav"
 
-    if not json_path.exists():
-        return jsonify({'error': f"Voice '{name}' not found"}), 404
+    refresh_voice_index()
+    with voice_dir_lock():
+        with _voice_index_lock:
+            if _voice_index.pop(name, None) is None:
+                return json_response({'error': f"Voice '{name}' not found"}, 404)
+            _voice_versions.pop(name, None)
 
-    json_path.unlink()
-    if wav_path.exists():
-        wav_path.unlink()
+        json_path.unlink(missing_ok=True)
+        wav_path.unlink(missing_ok=True)
+    evict_voice_refs(name)
 
-    return jsonify({'success': True, 'deleted': name})
+    return json_response({'success': True, 'deleted': name})
 
 
-if __name__ == '__main__':
+def log_startup():
+    """Log runtime versions and GPU details."""
     logger.info("Starting OpenF5-TTS server...")
     logger.info(f"PyTorch version: {torch.__version__}")
     logger.info(f"CUDA available: {torch.cuda.is_available()}")
@@ -361,7 +1028,72 @@ if __name__ == '__main__':
         logger.info(f"CUDA version: {torch.version.cuda}")
         logger.info(f"GPU: {torch.cuda.get_device_name(0)}")
 
+
+def create_app():
+    """
+    Load models and return the WSGI app.
+
+    Entry point for gunicorn: gunicorn -k gthread -w 1 'server:create_app()'
+    """
+    log_startup()
     load_models()
+    return app
+
+
+def serve_reuseport(port):
+    """
+    Serve the app with waitress on a SO_REUSEPORT socket shared by workers.
+
+    waitress is threaded and does not fork, so it can run in processes that
+    hold CUDA state handed over by the parent (gunicorn cannot).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(('0.0.0.0', port))
+    sock.listen(128)
+
+    serve(app, sockets=[sock], threads=WORKER_THREADS)
+
+
+def worker_main(rank, model, port):
+    """Spawned worker: adopt the parent's shared model and serve."""
+    global f5_model, device
+
+    f5_model = model
+    device = get_device()
+    logger.info(f"Worker {rank} starting on port {port}")
+
+    init_runtime()
+    serve_reuseport(port)
+
+
+def serve_workers(port):
+    """
+    Serve from NUM_WORKERS processes sharing the parent's GPU weights.
+
+    CUDA tensors passed to spawned processes travel as IPC handles, so the
+    weights occupy VRAM once. The parent must outlive the workers, which
+    mp.spawn(join=True) guarantees. The kernel balances connections across
+    workers through SO_REUSEPORT.
+    """
+    f5_model.ema_model.share_memory()
+    mp.spawn(
+        worker_main, args=(f5_model, port), nprocs=NUM_WORKERS, join=True
+    )
+
+
+if __name__ == '__main__':
+    if NUM_WORKERS > 1:
+        # Load weights once here; each spawned worker serves them
+        log_startup()
+        load_weights()
+
+        logger.info(f"Starting {NUM_WORKERS} workers on port 9288...")
+        serve_workers(9288)
+    else:
+        # Development server; the container runs gunicorn via create_app()
+        create_app()
 
-    logger.info("Server starting on port 9288...")
-    app.run(host='0.0.0.0', port=9288, threaded=True)
+        logger.info("Server starting on port 9288...")
+        app.run(host='0.0.0.0', port=9288, threaded=True)
@@ -11,17 +11,24 @@ MIT License
 
 import os
 import io
-import json
 import base64
+import fcntl
+import socket
 import tempfile
 import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, send_file, after_this_request
 from flask_cors import CORS
+from waitress import serve
+import orjson
 import torch
+import torch.multiprocessing as mp
+from openvoice import se_extractor
 import numpy as np
-import soundfile as sf
 
 # Configure logging
 logging.basicConfig(
@@ -36,12 +43,49 @@ CORS(app)
 # Global model instances
 tone_color_converter = None
 tts_model = None
+melo_speaker_id = None
 device = None
+autocast_dtype = None
+
+# Single GPU worker: model calls queue here in order while request threads
+# keep handling HTTP, JSON and file I/O concurrently
+GPU_EXEC = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gpu')
 
 # Voice storage
-VOICE_DIR = Path('/app/voices')
+VOICE_DIR = Path(os.environ.get('VOICE_DIR', '/app/voices'))
 VOICE_DIR.mkdir(exist_ok=True)
 
+# In-memory index of saved voices: name -> metadata (+ float32 'embedding').
+# Built once at startup, then kept in sync by extract_voice/delete_voice.
+_voice_index = {}
+_voice_index_lock = threading.Lock()
+# name -> version of its metadata file as last scanned (see voice_file_version)
+_voice_versions = {}
+
+# Worker processes sharing one copy of the GPU weights (python server.py only)
+NUM_WORKERS = int(os.environ.get('NUM_WORKERS', '1'))
+# Request threads per worker (matches gunicorn --threads in the Dockerfile)
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', '8'))
+
+# Pinned host staging buffers for embedding uploads: shape -> (buffer, event).
+# Only touched from the GPU thread.
+_se_staging = {}
+
+# Source (MeloTTS base speaker) embeddings, keyed by speaker_id.
+# The base speaker is fixed, so its embedding only needs extracting once.
+_source_se_cache = {}
+_source_se_lock = threading.Lock()
+
+# Optional torch.compile of the tone converter (TORCH_COMPILE=1 to enable)
+TORCH_COMPILE = os.environ.get('TORCH_COMPILE', '0') == '1'
+TORCH_COMPILE_MODE = os.environ.get('TORCH_COMPILE_MODE', 'default')
+
+# Phrase used to extract the base speaker embedding at startup
+WARMUP_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "This sentence is used to capture the base speaker's voice."
+)
+
 
 def get_device():
     """Detect and return the best available device."""
@@ -54,8 +98,42 @@ def get_device():
         return 'cpu'
 
 
+def preferred_half_dtype():
+    """Return bfloat16 where the GPU supports it, else float16."""
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+
+@contextmanager
+def inference_context():
+    """Disable autograd tracking and enable mixed precision on CUDA."""
+    with torch.inference_mode(), torch.autocast(
+        device_type='cuda',
+        dtype=autocast_dtype or torch.float16,
+        enabled=autocast_dtype is not None
+    ):
+        yield
+
+
+def json_response(obj, status=200):
+    """Serialize obj with orjson into a JSON response (faster than jsonify)."""
+    return app.response_class(
+        orjson.dumps(obj), status=status, mimetype='application/json'
+    )
+
+
+def run_on_gpu(fn, *args, **kwargs):
+    """Run fn on the dedicated GPU thread and wait for its result."""
+    return GPU_EXEC.submit(fn, *args, **kwargs).result()
+
+
 def load_models():
-    """Load OpenVoice and MeloTTS models."""
+    """Load OpenVoice and MeloTTS models and prepare this process to serve."""
+    load_weights()
+    init_runtime()
+
+
+def load_weights():
+    """Load OpenVoice and MeloTTS weights onto the device."""
     global tone_color_converter, tts_model, device
 
     device = get_device()
@@ -63,7 +141,6 @@ def load_models():
 
     try:
         from openvoice.api import ToneColorConverter
-        from openvoice import se_extractor
         from melo.api import TTS
 
         # Load tone color converter
@@ -79,20 +156,318 @@ def load_models():
         tts_model = TTS(language='EN', device=device)
         logger.info("MeloTTS loaded")
 
-        logger.info("All models loaded successfully")
-
     except Exception as e:
         logger.error(f"Failed to load models: {e}")
         raise
 
 
+def init_runtime():
+    """
+    Prepare this process to serve the loaded models.
+
+    Picks the autocast dtype, caches the base speaker embedding, warms up
+    and indexes saved voices. Runs once per serving process.
+    """
+    global melo_speaker_id, autocast_dtype
+
+    if device != 'cpu':
+        autocast_dtype = preferred_half_dtype()
+        logger.info(f"Autocast dtype: {autocast_dtype}")
+
+    # Base speaker is fixed (first MeloTTS speaker); resolve it once
+    melo_speaker_id = next(iter(tts_model.hps.data.spk2id.values()))
+
+    # Pre-compute the base speaker embedding so requests skip extraction
+    get_source_se(melo_speaker_id)
+    logger.info("Base speaker embedding cached")
+
+    if TORCH_COMPILE:
+        compile_models()
+
+    # Pay cuDNN autotuning, lazy kernel loading and any compilation
+    # before the first request
+    logger.info("Warming up models")
+    run_on_gpu(warmup_models, melo_speaker_id)
+
+    load_voice_index()
+
+    logger.info("All models loaded successfully")
+
+
+def compile_models():
+    """
+    Wrap the tone converter in torch.compile (compiled on first warm-up).
+
+    ToneColorConverter.convert() calls model.voice_conversion() rather
+    than forward(), so that method is compiled. Audio length varies per
+    request, so shapes are compiled as dynamic.
+    """
+    logger.info(f"Compiling tone converter (mode={TORCH_COMPILE_MODE})")
+    model = tone_color_converter.model
+    model.voice_conversion = torch.compile(
+        model.voice_conversion,
+        mode=TORCH_COMPILE_MODE,
+        fullgraph=False,
+        dynamic=True
+    )
+
+
+def warmup_models(speaker_id):
+    """Run one base synthesis and tone conversion end to end."""
+    source_se = get_source_se(speaker_id)
+
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_base:
+        base_path = tmp_base.name
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_out:
+        output_path = tmp_out.name
+
+    try:
+        synthesize_base(WARMUP_TEXT, speaker_id, base_path)
+        convert_tone(base_path, source_se, source_se, output_path)
+    finally:
+        os.unlink(base_path)
+        os.unlink(output_path)
+
+
+def synthesize_base(text, speaker_id, output_path, speed=1.0):
+    """Generate base speaker audio with MeloTTS."""
+    with inference_context():
+        tts_model.tts_to_file(text, speaker_id, output_path, speed=speed)
+
+
+def convert_tone(base_path, source_se, target_se, output_path):
+    """Apply the target speaker's tone color to base audio."""
+    with inference_context():
+        tone_color_converter.convert(
+            audio_src_path=base_path,
+            src_se=source_se,
+            tgt_se=target_se,
+            output_path=output_path
+        )
+
+
+def get_source_se(speaker_id):
+    """
+    Return the source speaker embedding for a MeloTTS speaker.
+
+    On a cache miss the embedding is extracted from a freshly synthesized
+    warm-up phrase. Only the EN model is loaded, so the speaker alone
+    identifies the embedding.
+    """
+    with _source_se_lock:
+        source_se = _source_se_cache.get(speaker_id)
+    if source_se is not None:
+        return source_se
+
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+        tmp_path = tmp.name
+
+    try:
+        synthesize_base(WARMUP_TEXT, speaker_id, tmp_path)
+        source_se, _ = se_extractor.get_se(
+            tmp_path,
+            tone_color_converter,
+            vad=False
+        )
+    finally:
+        os.unlink(tmp_path)
+
+    source_se = source_se.to(device, non_blocking=True)
+    with _source_se_lock:
+        _source_se_cache[speaker_id] = source_se
+
+    return source_se
+
+
+def split_reference(audio_path, segment_dir):
+    """
+    Split reference audio into speech segments for embedding extraction.
+
+    Mirrors se_extractor.get_se(vad=False) up to extract_se(). The
+    faster-whisper segmentation runs on CPU, so callers keep it off the
+    GPU thread.
+    """
+    wavs_folder = se_extractor.split_audio_whisper(
+        audio_path, target_dir=segment_dir, audio_name=Path(audio_path).stem
+    )
+    segments = sorted(str(p) for p in Path(wavs_folder).glob('*.wav'))
+    if not segments:
+        raise ValueError('No audio segments found')
+
+    return segments
+
+
+def upload_embedding(embedding):
+    """
+    Copy a speaker embedding to the device through a pinned staging buffer.
+
+    The host-to-device copy is asynchronous; the staging buffer is only
+    refilled after the previous copy from it has completed. Each call gets
+    its own device tensor, so queued requests never share one. Must run on
+    the GPU thread.
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    if device == 'cpu':
+        return torch.from_numpy(np.array(embedding))
+
+    shape = tuple(embedding.shape)
+    if shape not in _se_staging:
+        staging = torch.empty(shape, dtype=torch.float32, pin_memory=True)
+        _se_staging[shape] = (staging, torch.cuda.Event())
+    staging, copied = _se_staging[shape]
+
+    copied.synchronize()
+    np.copyto(staging.numpy(), embedding)
+
+    target_se = torch.empty(shape, dtype=torch.float32, device=device)
+    target_se.copy_(staging, non_blocking=True)
+    copied.record()
+
+    return target_se
+
+
+def decode_embedding(embedding_b64, shape):
+    """Decode a base64 float32 speaker embedding into an array of shape."""
+    embedding_bytes = base64.b64decode(embedding_b64)
+    return np.frombuffer(embedding_bytes, dtype=np.float32).reshape(shape)
+
+
+@contextmanager
+def voice_dir_lock():
+    """Serialize saved-voice writes and deletes across threads and workers."""
+    with open(VOICE_DIR / '.lock', 'wb') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def write_voice_file(path, data):
+    """
+    Write a saved-voice file through a unique temp file and os.replace().
+
+    Readers never see a partial file, and every write creates a new inode,
+    which voice_file_version() relies on.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=VOICE_DIR, prefix=f'.{path.name}.', suffix='.tmp'
+    )
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def voice_file_version(path):
+    """
+    Identify one write of a voice metadata file.
+
+    Files are only ever replaced, never rewritten, so (mtime, inode)
+    changes on every write even where timestamps are coarse.
+    """
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_ino)
+
+
+def index_voice(name, data, embedding=None, version=None):
+    """
+    Add or replace a saved voice in the in-memory index.
+
+    The embedding is read from <name>.npy when not given, falling back to
+    the base64 'embedding' field of voices saved before .npy storage.
+    """
+    entry = {k: v for k, v in data.items() if k != 'embedding'}
+    if embedding is None:
+        npy_path = VOICE_DIR / f"{name}.npy"
+        if npy_path.exists():
+            embedding = np.load(npy_path)
+        else:
+            embedding = decode_embedding(data['embedding'], data['shape'])
+    entry['embedding'] = np.ascontiguousarray(embedding, dtype=np.float32)
+    if version is None:
+        version = voice_file_version(VOICE_DIR / f"{name}.json")
+
+    with _voice_index_lock:
+        _voice_index[name] = entry
+        _voice_versions[name] = version
+
+
+def load_voice_index():
+    """Scan VOICE_DIR and (re)build the saved voice index with embeddings."""
+    versions = {}
+    names = set()
+    for voice_file in VOICE_DIR.glob('*.json'):
+        try:
+            # Version first: a write racing the read is caught next refresh
+            version = voice_file_version(voice_file)
+            versions[voice_file.stem] = version
+            with open(voice_file, 'rb') as f:
+                index_voice(
+                    voice_file.stem, orjson.loads(f.read()), version=version
+                )
+            names.add(voice_file.stem)
+        except Exception as e:
+            logger.warning(f"Could not read voice file {voice_file}: {e}")
+
+    # Every listed voice was just re-read from disk, so voices overwritten
+    # elsewhere already carry their new embedding; drop deleted ones
+    with _voice_index_lock:
+        _voice_versions.clear()
+        _voice_versions.update(versions)
+        for name in [name for name in _voice_index if name not in names]:
+            del _voice_index[name]
+
+    logger.info(f"Indexed {len(names)} saved voices")
+
+
+def scan_voice_versions():
+    """Return name -> version for every voice metadata file on disk."""
+    versions = {}
+    for voice_file in VOICE_DIR.glob('*.json'):
+        try:
+            versions[voice_file.stem] = voice_file_version(voice_file)
+        except FileNotFoundError:
+            continue
+    return versions
+
+
+def refresh_voice_index():
+    """
+    Rescan VOICE_DIR if a sibling worker process changed it.
+
+    Compares per-voice metadata versions rather than the directory mtime,
+    which can miss two changes within one coarse timestamp tick. Each
+    worker keeps its own index; with a single process the index is always
+    current and this is a no-op.
+    """
+    if NUM_WORKERS == 1:
+        return
+
+    versions = scan_voice_versions()
+    with _voice_index_lock:
+        stale = versions != _voice_versions
+    if stale:
+        load_voice_index()
+
+
+def read_json_body():
+    """Parse the request body with orjson; None if missing or not an object."""
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
     cuda_available = torch.cuda.is_available()
     gpu_name = torch.cuda.get_device_name(0) if cuda_available else None
 
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'model': 'openvoice_v2',
         'cuda_available': cuda_available,
@@ -104,7 +479,7 @@ def health():
 @app.route('/info', methods=['GET'])
 def info():
     """Return model information."""
-    return jsonify({
+    return json_response({
         'model': 'OpenVoice V2',
         'license': 'MIT',
         'capabilities': ['voice_cloning', 'tts'],
@@ -125,14 +500,14 @@ def extract_voice():
     """
     try:
         if 'audio' not in request.files:
-            return jsonify({'error': 'No audio file provided'}), 400
+            return json_response({'error': 'No audio file provided'}, 400)
 
         audio_file = request.files['audio']
         transcript = request.form.get('transcript', '')
         voice_name = request.form.get('name')
 
         if not transcript:
-            return jsonify({'error': 'Transcript is required'}), 400
+            return json_response({'error': 'Transcript is required'}, 400)
 
         # Save audio to temp file
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
@@ -140,35 +515,38 @@ def extract_voice():
             tmp_path = tmp.name
 
         try:
-            from openvoice import se_extractor
-
-            # Extract speaker embedding
-            # vad=False to avoid rejecting valid audio with pauses
-            target_se, audio_name = se_extractor.get_se(
-                tmp_path,
-                tone_color_converter,
-                vad=False
-            )
-
-            # Convert to serializable format
-            embedding_data = target_se.cpu().numpy().tobytes()
-            embedding_b64 = base64.b64encode(embedding_data).decode('utf-8')
-
-            # Save if name provided
+            # Segment on this thread (Whisper on CPU; no VAD, to avoid
+            # rejecting valid audio with pauses); only the embedding
+            # extraction queues for the GPU
+            with tempfile.TemporaryDirectory() as segment_dir:
+                segments = split_reference(tmp_path, segment_dir)
+                target_se = run_on_gpu(tone_color_converter.extract_se, segments)
+
+            # Save if name provided (embedding as half-precision .npy,
+            # metadata in JSON)
             if voice_name:
-                voice_path = VOICE_DIR / f"{voice_name}.json"
+                embedding = target_se.cpu().numpy().astype(np.float16)
+                npy_buffer = io.BytesIO()
+                np.save(npy_buffer, embedding)
+
                 voice_data = {
-                    'embedding': embedding_b64,
-                    'shape': list(target_se.shape),
+                    'shape': list(embedding.shape),
+                    'dtype': str(embedding.dtype),
                     'transcript': transcript,
                     'model': 'openvoice_v2'
                 }
-                with open(voice_path, 'w') as f:
-                    json.dump(voice_data, f)
+                with voice_dir_lock():
+                    write_voice_file(
+                        VOICE_DIR / f"{voice_name}.npy", npy_buffer.getvalue()
+                    )
+                    write_voice_file(
+                        VOICE_DIR / f"{voice_name}.json", orjson.dumps(voice_data)
+                    )
+                    index_voice(voice_name, voice_data, embedding)
                 logger.info(f"Voice saved as: {voice_name}")
 
             # Return VoiceInfo-compatible response
-            return jsonify({
+            return json_response({
                 'name': voice_name if voice_name else 'unnamed',
                 'transcript': transcript,
                 'model': 'openvoice_v2',
@@ -180,7 +558,7 @@ def extract_voice():
 
     except Exception as e:
         logger.error(f"Voice extraction failed: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @app.route('/synthesize', methods=['POST'])
@@ -192,135 +570,136 @@ def synthesize():
     - text: Text to synthesize
     - embedding: Base64 encoded voice embedding (from extract_voice)
     - OR name: Name of a saved voice
-    - language: (optional) Language code (default: EN)
+    - language: (optional) Ignored; only the EN MeloTTS model is loaded
     - speed: (optional) Speech speed (default: 1.0)
     """
     try:
-        data = request.get_json()
+        data = read_json_body()
 
         if not data:
-            return jsonify({'error': 'JSON body required'}), 400
+            return json_response({'error': 'JSON body required'}, 400)
 
         text = data.get('text')
         if not text:
-            return jsonify({'error': 'Text is required'}), 400
+            return json_response({'error': 'Text is required'}, 400)
 
-        language = data.get('language', 'EN')
         speed = data.get('speed', 1.0)
 
         # Get voice embedding
         if 'name' in data:
-            # Load saved voice
-            voice_path = VOICE_DIR / f"{data['name']}.json"
-            if not voice_path.exists():
-                return jsonify({'error': f"Voice '{data['name']}' not found"}), 404
+            # Saved voice from the in-memory index
+            refresh_voice_index()
+            with _voice_index_lock:
+                voice = _voice_index.get(data['name'])
 
-            with open(voice_path) as f:
-                voice_data = json.load(f)
+            if voice is None:
+                return json_response({'error': f"Voice '{data['name']}' not found"}, 404)
 
-            embedding_b64 = voice_data['embedding']
-            shape = voice_data['shape']
+            embedding = voice['embedding']
 
         elif 'embedding' in data:
-            embedding_b64 = data['embedding']
-            shape = data.get('shape', [1, 256])
+            embedding = decode_embedding(
+                data['embedding'], data.get('shape', [1, 256])
+            )
 
         else:
-            return jsonify({'error': 'Either embedding or name is required'}), 400
+            return json_response({'error': 'Either embedding or name is required'}, 400)
 
-        # Decode embedding
-        embedding_bytes = base64.b64decode(embedding_b64)
-        target_se = torch.from_numpy(
-            np.frombuffer(embedding_bytes, dtype=np.float32).reshape(shape)
-        ).to(device)
+        # Queue the embedding upload ahead of base synthesis so the copy
+        # overlaps MeloTTS text processing
+        target_se = run_on_gpu(upload_embedding, embedding)
 
         # Generate base audio with MeloTTS
-        speaker_ids = tts_model.hps.data.spk2id
-        speaker_id = list(speaker_ids.values())[0]  # Use first speaker
+        speaker_id = melo_speaker_id
 
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_base:
-            tts_model.tts_to_file(
-                text,
-                speaker_id,
-                tmp_base.name,
-                speed=speed
-            )
             base_path = tmp_base.name
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_out:
+            output_path = tmp_out.name
 
         try:
-            # Get source speaker embedding from base audio
-            from openvoice import se_extractor
-            source_se, _ = se_extractor.get_se(
+            run_on_gpu(
+                synthesize_base,
+                text,
+                speaker_id,
                 base_path,
-                tone_color_converter,
-                vad=False
+                speed=speed
             )
 
+            # Base speaker embedding, extracted once at startup
+            source_se = get_source_se(speaker_id)
+
             # Apply tone color conversion
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_out:
-                tone_color_converter.convert(
-                    audio_src_path=base_path,
-                    src_se=source_se,
-                    tgt_se=target_se,
-                    output_path=tmp_out.name
-                )
-                output_path = tmp_out.name
-
-            try:
-                # Read output audio
-                audio_data, sample_rate = sf.read(output_path)
-
-                # Convert to bytes
-                buffer = io.BytesIO()
-                sf.write(buffer, audio_data, sample_rate, format='WAV')
-                buffer.seek(0)
-
-                return send_file(
-                    buffer,
-                    mimetype='audio/wav',
-                    as_attachment=True,
-                    download_name='output.wav'
-                )
+            run_on_gpu(
+                convert_tone,
+                base_path,
+                source_se,
+                target_se,
+                output_path
+            )
 
-            finally:
-                os.unlink(output_path)
+        except Exception:
+            os.unlink(output_path)
+            raise
 
         finally:
             os.unlink(base_path)
 
+        # Stream the converter's WAV as-is (no decode/re-encode); remove it
+        # once the response has opened the file
+        @after_this_request
+        def cleanup_output(response):
+            os.unlink(output_path)
+            return response
+
+        return send_file(
+            output_path,
+            mimetype='audio/wav',
+            as_attachment=True,
+            download_name='output.wav',
+            conditional=True
+        )
+
     except Exception as e:
         logger.error(f"Synthesis failed: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @app.route('/voices', methods=['GET'])
 def list_voices():
     """List all saved voices."""
-    voices = []
-    for voice_file in VOICE_DIR.glob('*.json'):
-        with open(voice_file) as f:
-            data = json.load(f)
-        voices.append({
-            'name': voice_file.stem,
-            'transcript': data.get('transcript', ''),
-            'model': data.get('model', 'unknown')
-        })
+    refresh_voice_index()
+    with _voice_index_lock:
+        voices = [
+            {
+                'name': name,
+                'transcript': data.get('transcript', ''),
+                'model': data.get('model', 'unknown')
+            }
+            for name, data in _voice_index.items()
+        ]
 
-    return jsonify({'voices': voices})
+    return json_response({'voices': voices})
 
 
 @app.route('/voices/<name>', methods=['DELETE'])
 def delete_voice(name):
     """Delete a saved voice."""
-    voice_path = VOICE_DIR / f"{name}.json"
-    if not voice_path.exists():
-        return jsonify({'error': f"Voice '{name}' not found"}), 404
+    refresh_voice_index()
+    with voice_dir_lock():
+        with _voice_index_lock:
+            if _voice_index.pop(name, None) is None:
+                return json_response({'error': f"Voice '{name}' not found"}, 404)
+            _voice_versions.pop(name, None)
 
-    voice_path.unlink()
-    return jsonify({'success': True, 'deleted': name})
+        (VOICE_DIR / f"{name}.json").unlink(missing_ok=True)
+        (VOICE_DIR / f"{name}.npy").unlink(missing_ok=True)
 
+    return json_response({'success': True, 'deleted': name})
 
-if __name__ == '__main__':
+
+def log_startup():
+    """Log runtime versions and GPU details."""
     logger.info("Starting OpenVoice V2 server...")
     logger.info(f"PyTorch version: {torch.__version__}")
     logger.info(f"CUDA available: {torch.cuda.is_available()}")
@@ -329,7 +708,76 @@ if __name__ == '__main__':
         logger.info(f"CUDA version: {torch.version.cuda}")
         logger.info(f"GPU: {torch.cuda.get_device_name(0)}")
 
+
+def create_app():
+    """
+    Load models and return the WSGI app.
+
+    Entry point for gunicorn: gunicorn -k gthread -w 1 'server:create_app()'
+    """
+    log_startup()
     load_models()
+    return app
+
+
+def serve_reuseport(port):
+    """
+    Serve the app with waitress on a SO_REUSEPORT socket shared by workers.
+
+    waitress is threaded and does not fork, so it can run in processes that
+    hold CUDA state handed over by the parent (gunicorn cannot).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(('0.0.0.0', port))
+    sock.listen(128)
+
+    serve(app, sockets=[sock], threads=WORKER_THREADS)
+
+
+def worker_main(rank, models, port):
+    """Spawned worker: adopt the parent's shared models and serve."""
+    global tone_color_converter, tts_model, device
+
+    tone_color_converter, tts_model = models
+    device = get_device()
+    logger.info(f"Worker {rank} starting on port {port}")
+
+    init_runtime()
+    serve_reuseport(port)
+
+
+def serve_workers(port):
+    """
+    Serve from NUM_WORKERS processes sharing the parent's GPU weights.
+
+    CUDA tensors passed to spawned processes travel as IPC handles, so the
+    weights occupy VRAM once. The parent must outlive the workers, which
+    mp.spawn(join=True) guarantees. The kernel balances connections across
+    workers through SO_REUSEPORT.
+    """
+    tone_color_converter.model.share_memory()
+    tts_model.share_memory()
+    mp.spawn(
+        worker_main,
+        args=((tone_color_converter, tts_model), port),
+        nprocs=NUM_WORKERS,
+        join=True
+    )
+
+
+if __name__ == '__main__':
+    if NUM_WORKERS > 1:
+        # Load weights once here; each spawned worker serves them
+        log_startup()
+        load_weights()
+
+        logger.info(f"Starting {NUM_WORKERS} workers on port 9280...")
+        serve_workers(9280)
+    else:
+        # Development server; the container runs gunicorn via create_app()
+        create_app()
 
-    logger.info("Server starting on port 9280...")
-    app.run(host='0.0.0.0', port=9280, threaded=True)
+        logger.info("Server starting on port 9280...")
+        app.run(host='0.0.0.0', port=9280, threaded=True)
@@ -0,0 +1,16 @@
+"""Shared pytest setup for the backend server tests.
+
+The servers are single-file scripts under docker/<service>/; tests import
+them as modules with VOICE_DIR pointed at a temporary directory. Model
+objects are stubbed per test, so no weights or GPU are needed.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+DOCKER_DIR = Path(__file__).resolve().parent.parent / 'docker'
+
+os.environ.setdefault('VOICE_DIR', tempfile.mkdtemp(prefix='voices-'))
+sys.path.insert(0, str(DOCKER_DIR / 'openf5'))
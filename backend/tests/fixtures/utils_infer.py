@@ -0,0 +1,25 @@
+# Excerpt of f5_tts/infer/utils_infer.py with the code patch_f5tts.py targets.
+import hashlib
+
+import torch
+import torchaudio
+
+device = "cuda" if torch.cuda.is_available() else "cpu"
+
+_ref_audio_cache = {}
+
+
+def preprocess_ref_audio_text(ref_audio_orig, ref_text, show_info=print):
+    show_info("Converting audio...")
+
+    # Compute a hash of the reference audio file
+    with open(ref_audio_orig, "rb") as audio_file:
+        audio_data = audio_file.read()
+        audio_hash = hashlib.md5(audio_data).hexdigest()
+
+    return audio_hash, ref_text
+
+
+def load_reference(ref_audio):
+    audio, sr = torchaudio.load(ref_audio)
+    return audio, sr
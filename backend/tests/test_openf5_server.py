@@ -0,0 +1,322 @@
+"""Tests for the OpenF5-TTS server's caching, batching and request handling.
+
+The F5-TTS model is never loaded: tests stub f5_model and the helpers
+bound in init_runtime() where a code path needs them.
+"""
+
+import io
+from collections import OrderedDict
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import orjson
+import pytest
+import soundfile as sf
+import torch
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(server, '_ref_cache', OrderedDict())
+    monkeypatch.setattr(server, '_audio_cache', OrderedDict())
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def make_ref(key=None, ref_len=100, ref_text='0123456789'):
+    ref = {
+        'mel': torch.zeros(1, ref_len, 4),
+        'ref_text': ref_text,
+        'rms': server.TARGET_RMS,
+        'duration': 2.0
+    }
+    if key is not None:
+        ref['key'] = key
+    return ref
+
+
+# ref_cache_key
+
+def test_saved_voice_key_includes_version():
+    old = server.ref_cache_key('hello', voice_name='v', version=(1, 10))
+    new = server.ref_cache_key('hello', voice_name='v', version=(2, 11))
+    assert old != new
+    assert old[:2] == ('name', 'v')
+
+
+def test_inline_key_hashes_whole_audio():
+    # Same length, header and leading silence; only the tail differs
+    head = b'RIFF' + bytes(200000)
+    a = server.ref_cache_key('hello', ref_audio_bytes=head + b'\x01')
+    b = server.ref_cache_key('hello', ref_audio_bytes=head + b'\x02')
+    assert a != b
+    assert a == server.ref_cache_key('hello', ref_audio_bytes=head + b'\x01')
+
+
+def test_inline_key_includes_transcript():
+    audio = b'RIFF' + bytes(100)
+    assert (
+        server.ref_cache_key('one', ref_audio_bytes=audio)
+        != server.ref_cache_key('two', ref_audio_bytes=audio)
+    )
+
+
+# cross_fade
+
+def test_cross_fade_single_wave_unchanged():
+    wave = np.arange(10, dtype=np.float32)
+    assert np.array_equal(server.cross_fade([wave]), wave)
+
+
+def test_cross_fade_overlaps_by_fade_length():
+    fade_len = int(server.CROSS_FADE_DURATION * server.SAMPLE_RATE)
+    a = np.ones(fade_len * 2, dtype=np.float32)
+    b = np.zeros(fade_len * 2, dtype=np.float32)
+
+    result = server.cross_fade([a, b])
+
+    assert len(result) == len(a) + len(b) - fade_len
+    assert result[fade_len] == pytest.approx(1.0)
+    assert result[-1] == 0.0
+    assert np.all(np.diff(result[fade_len:2 * fade_len]) <= 0)
+
+
+def test_cross_fade_short_wave_limits_overlap():
+    a = np.ones(5000, dtype=np.float32)
+    b = np.zeros(10, dtype=np.float32)
+    assert len(server.cross_fade([a, b])) == 5000
+
+
+# chunk_duration
+
+def test_chunk_duration_scales_with_text_and_speed():
+    ref = make_ref(ref_len=100, ref_text='0123456789')
+    gen = 'x' * 20
+
+    assert server.chunk_duration(ref, gen, 1.0) == 100 + 200
+    assert server.chunk_duration(ref, gen, 2.0) == 100 + 100
+
+
+def test_chunk_duration_slows_only_tiny_chunks():
+    ref = make_ref(ref_len=100, ref_text='0123456789')
+    assert server.chunk_duration(ref, 'No.', 1.0) == 100 + int(10 * 3 / 0.3)
+
+
+# get_reference LRU
+
+def test_get_reference_builds_once_and_tags_key(monkeypatch):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return make_ref()
+
+    first = server.get_reference('k', build)
+    second = server.get_reference('k', build)
+
+    assert first is second
+    assert first['key'] == 'k'
+    assert len(calls) == 1
+
+
+def test_get_reference_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(server, 'REF_CACHE_SIZE', 2)
+
+    server.get_reference('a', make_ref)
+    server.get_reference('b', make_ref)
+    server.get_reference('a', make_ref)
+    server.get_reference('c', make_ref)
+
+    assert list(server._ref_cache) == ['a', 'c']
+
+
+# audio cache
+
+def test_put_cached_audio_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(server, 'AUDIO_CACHE_SIZE', 2)
+    wave = np.zeros(4, dtype=np.float32)
+
+    server.put_cached_audio('a', wave)
+    server.put_cached_audio('b', wave)
+    assert server.get_cached_audio('a') is wave
+    server.put_cached_audio('c', wave)
+
+    assert server.get_cached_audio('b') is None
+    assert list(server._audio_cache) == ['a', 'c']
+
+
+def test_evict_voice_refs_drops_references_and_audio():
+    key = server.ref_cache_key('t', voice_name='v', version=(1, 1))
+    other = server.ref_cache_key('t', voice_name='w', version=(1, 1))
+    server.get_reference(key, make_ref)
+    server.get_reference(other, make_ref)
+    server.put_cached_audio((key, 1.0, b'h'), np.zeros(1))
+
+    server.evict_voice_refs('v')
+
+    assert list(server._ref_cache) == [other]
+    assert not server._audio_cache
+
+
+# generate_speech
+
+@pytest.fixture
+def stub_chunks(monkeypatch):
+    """Pass text through as one chunk and complete chunks immediately."""
+    submitted = []
+
+    def submit_chunk(ref, text, speed):
+        submitted.append(text)
+        future = Future()
+        future.set_result(np.full(100, len(submitted), dtype=np.float32))
+        return future
+
+    monkeypatch.setattr(server, 'chunk_text', lambda text, max_chars: [text])
+    monkeypatch.setattr(server, 'submit_chunk', submit_chunk)
+    return submitted
+
+
+def test_generate_speech_blank_text_skips_generation(stub_chunks):
+    wave, sr = server.generate_speech(make_ref(key='k'), '  \n ')
+    assert len(wave) == 0
+    assert sr == server.SAMPLE_RATE
+    assert stub_chunks == []
+
+
+def test_generate_speech_keeps_short_sentences_in_one_chunk(stub_chunks):
+    server.generate_speech(make_ref(key='k'), 'No. I said no.')
+    assert stub_chunks == ['No. I said no.']
+
+
+def test_generate_speech_reuses_cached_audio(stub_chunks):
+    ref = make_ref(key='k')
+
+    first, _ = server.generate_speech(ref, 'Hello there.')
+    second, _ = server.generate_speech(ref, 'Hello there.')
+    server.generate_speech(ref, 'Hello there.', speed=1.5)
+
+    assert np.array_equal(first, second)
+    assert stub_chunks == ['Hello there.', 'Hello there.']
+
+
+def test_generate_speech_does_not_cache_unkeyed_refs(stub_chunks):
+    ref = make_ref()
+    server.generate_speech(ref, 'Warm up.')
+    server.generate_speech(ref, 'Warm up.')
+    assert len(stub_chunks) == 2
+    assert not server._audio_cache
+
+
+# sample_batch with a stub model
+
+class StubCFM:
+    def sample(self, cond, text, duration, lens, **kwargs):
+        batch, frames = len(text), int(duration.max())
+        return torch.ones(batch, frames, cond.shape[-1]), None
+
+
+class StubVocoder:
+    def decode(self, mel):
+        # One sample per mel frame
+        return torch.ones(1, mel.shape[-1])
+
+
+def test_sample_batch_trims_each_item_to_its_duration(monkeypatch):
+    monkeypatch.setattr(server, 'f5_model', SimpleNamespace(
+        ema_model=StubCFM(), vocoder=StubVocoder(), mel_spec_type='vocos'
+    ))
+    monkeypatch.setattr(server, 'convert_char_to_pinyin', lambda texts: texts)
+
+    items = [
+        {'ref': make_ref(ref_len=10), 'text': 'a', 'duration': 30},
+        {'ref': make_ref(ref_len=20), 'text': 'b', 'duration': 25},
+    ]
+    waves = server.sample_batch(items)
+
+    assert [len(w) for w in waves] == [20, 5]
+
+
+# read_json_body
+
+@pytest.mark.parametrize('body, expected', [
+    (b'{"text": "hi"}', {'text': 'hi'}),
+    (b'["not", "an", "object"]', None),
+    (b'{not json', None),
+    (b'', None),
+])
+def test_read_json_body(body, expected):
+    with server.app.test_request_context('/', method='POST', data=body):
+        assert server.read_json_body() == expected
+
+
+# /synthesize_raw
+
+def raw_headers(**overrides):
+    headers = {'X-Text': 'Hello%20world', 'X-Transcript': 'Reference'}
+    headers.update(overrides)
+    return {k: v for k, v in headers.items() if v is not None}
+
+
+@pytest.mark.parametrize('speed', ['abc', '', '0', '-1', 'nan', 'inf'])
+def test_synthesize_raw_rejects_bad_speed(client, speed):
+    response = client.post(
+        '/synthesize_raw', data=b'RIFF', headers=raw_headers(**{'X-Speed': speed})
+    )
+    assert response.status_code == 400
+    assert 'X-Speed' in orjson.loads(response.data)['error']
+
+
+@pytest.mark.parametrize('missing', ['X-Text', 'X-Transcript'])
+def test_synthesize_raw_requires_headers(client, missing):
+    response = client.post(
+        '/synthesize_raw', data=b'RIFF', headers=raw_headers(**{missing: None})
+    )
+    assert response.status_code == 400
+
+
+def test_synthesize_raw_requires_body(client):
+    response = client.post('/synthesize_raw', data=b'', headers=raw_headers())
+    assert response.status_code == 400
+
+
+def test_synthesize_raw_rejects_oversized_body(client, monkeypatch):
+    monkeypatch.setattr(server, 'MAX_REF_AUDIO_BYTES', 8)
+    response = client.post(
+        '/synthesize_raw', data=b'x' * 9, headers=raw_headers()
+    )
+    assert response.status_code == 413
+
+
+def test_synthesize_raw_returns_wav(client, monkeypatch):
+    seen = {}
+
+    def inline_reference(audio_bytes, ref_text):
+        seen['ref'] = (audio_bytes, ref_text)
+        return make_ref(key='k')
+
+    def generate_speech(ref, text, speed=1.0):
+        seen['gen'] = (text, speed)
+        return np.zeros(240, dtype=np.float32), server.SAMPLE_RATE
+
+    monkeypatch.setattr(server, 'inline_reference', inline_reference)
+    monkeypatch.setattr(server, 'generate_speech', generate_speech)
+
+    response = client.post(
+        '/synthesize_raw', data=b'RIFF....',
+        headers=raw_headers(**{'X-Speed': '1.25'})
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == 'audio/wav'
+    assert seen == {
+        'ref': (b'RIFF....', 'Reference'), 'gen': ('Hello world', 1.25)
+    }
+    audio, sr = sf.read(io.BytesIO(response.data))
+    assert sr == server.SAMPLE_RATE
+    assert len(audio) == 240
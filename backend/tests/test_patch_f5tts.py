@@ -0,0 +1,94 @@
+"""Tests for docker/openf5/patch_f5tts.py against a utils_infer.py excerpt."""
+
+import hashlib
+import importlib.util
+import io
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from conftest import DOCKER_DIR
+
+PATCH_SCRIPT = DOCKER_DIR / 'openf5' / 'patch_f5tts.py'
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'utils_infer.py'
+
+
+def run_patch(path):
+    return subprocess.run(
+        [sys.executable, str(PATCH_SCRIPT), str(path)],
+        capture_output=True, text=True, check=True
+    )
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location('patched_utils_infer', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def patched(tmp_path):
+    target = tmp_path / 'utils_infer.py'
+    shutil.copy(FIXTURE, target)
+    result = run_patch(target)
+    assert 'Successfully patched' in result.stdout
+    return target
+
+
+def test_applies_both_patches(patched):
+    content = patched.read_text()
+    assert 'torchaudio.load(ref_audio)' not in content
+    assert 'with open(ref_audio_orig, "rb") as audio_file:' not in content
+    assert '_rewound(ref_audio_orig)' in content
+
+
+def test_rerun_warns_and_leaves_file_unchanged(patched):
+    before = patched.read_text()
+    result = run_patch(patched)
+    assert result.stdout.count('Warning') == 2
+    assert patched.read_text() == before
+
+
+def test_bytesio_hashed_in_place_and_rewound(patched):
+    module = load_module(patched)
+    data = b'RIFF' + bytes(range(256)) * 64
+    buffer = io.BytesIO(data)
+
+    audio_hash, _ = module.preprocess_ref_audio_text(
+        buffer, 'text', show_info=lambda *a: None
+    )
+
+    assert audio_hash == hashlib.md5(data).hexdigest()
+    assert not buffer.closed
+    assert buffer.tell() == 0
+
+
+def test_bytes_and_path_inputs(patched, tmp_path):
+    module = load_module(patched)
+    data = b'reference audio bytes'
+    audio_path = tmp_path / 'ref.wav'
+    audio_path.write_bytes(data)
+    expected = hashlib.md5(data).hexdigest()
+
+    for ref_audio in (data, str(audio_path)):
+        audio_hash, _ = module.preprocess_ref_audio_text(
+            ref_audio, 'text', show_info=lambda *a: None
+        )
+        assert audio_hash == expected
+
+
+def test_soundfile_load_returns_channels_first(patched, tmp_path):
+    module = load_module(patched)
+    audio_path = tmp_path / 'ref.wav'
+    sf.write(audio_path, np.zeros((1000, 2), dtype=np.float32), 24000)
+
+    audio, sr = module.load_reference(str(audio_path))
+
+    assert sr == 24000
+    assert tuple(audio.shape) == (2, 1000)